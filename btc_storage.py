@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Optional SQLite storage backend for price history and AHR999 indicators
+Enable with AHR999_STORAGE=sqlite (database path from AHR999_DB, default ahr999.db)
+"""
+
+import csv
+import os
+import re
+import sqlite3
+
+CSV_FILE = 'btc-price all.csv'
+DB_FILE = os.environ.get('AHR999_DB', 'ahr999.db')
+DEFAULT_ASSET = 'btc'
+
+# FX rates are units of each currency per 1 USD
+FX_FILE = 'fx-rates.csv'
+CURRENCIES = [c.strip().lower() for c in os.environ.get('AHR999_CURRENCIES', 'cny,eur').split(',') if c.strip()]
+
+def use_sqlite():
+    """Whether the SQLite backend is enabled"""
+    return os.environ.get('AHR999_STORAGE', 'csv').lower() == 'sqlite'
+
+def price_table(asset):
+    """Table name holding the price series of an asset"""
+    # Asset names become part of the table name, so only allow plain identifiers
+    if not re.fullmatch(r'[a-z][a-z0-9_]*', asset):
+        raise ValueError(f"Invalid asset name: {asset!r}")
+    return f"prices_{asset}"
+
+def ensure_asset(conn, asset):
+    """Create the price table of an asset if needed"""
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {price_table(asset)} (
+            date TEXT PRIMARY KEY,
+            price REAL NOT NULL
+        ) WITHOUT ROWID
+    """)
+
+def connect(path=DB_FILE, asset=DEFAULT_ASSET, csv_file=CSV_FILE, fx_file=FX_FILE):
+    """Open the database in WAL mode, importing CSV rows newer than the database"""
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS indicators (
+            asset TEXT NOT NULL,
+            date TEXT NOT NULL,
+            ma_200d REAL,
+            ma_200w_fit REAL,
+            ahr999 REAL,
+            PRIMARY KEY (asset, date)
+        ) WITHOUT ROWID
+    """)
+    ensure_asset(conn, asset)
+    if os.path.exists(csv_file):
+        import_csv(conn, csv_file, asset)
+    if os.path.exists(fx_file):
+        import_fx_csv(conn, fx_file)
+    conn.commit()
+    return conn
+
+def latest_date(conn, asset=DEFAULT_ASSET):
+    """Newest stored date of an asset, or None if it has no rows"""
+    ensure_asset(conn, asset)
+    return conn.execute(f"SELECT MAX(date) FROM {price_table(asset)}").fetchone()[0]
+
+def newer_rows(conn, rows, asset=DEFAULT_ASSET):
+    """Keep (date, price) rows from the newest stored date onwards that differ from the database"""
+    # Edits to older CSV rows are not picked up; the CSV updaters only touch the latest rows
+    ensure_asset(conn, asset)
+    latest = conn.execute(f"SELECT date, price FROM {price_table(asset)} ORDER BY date DESC LIMIT 1").fetchone()
+    # The last row for a date wins, as rows appended by update_db come last
+    rows = list(dict(rows).items())
+    if latest:
+        rows = [r for r in rows if r[0] > latest[0] or (r[0] == latest[0] and r[1] != latest[1])]
+    return rows
+
+def import_csv(conn, csv_file=CSV_FILE, asset=DEFAULT_ASSET):
+    """Load CSV rows from the newest stored date onwards into the price table"""
+    with open(csv_file, 'r', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader)
+        rows = [(row[0], float(row[1])) for row in reader if len(row) > 1 and row[0] and row[1]]
+    rows = newer_rows(conn, rows, asset)
+    if not rows:
+        return
+    upsert_prices(conn, rows, asset)
+    print(f"Imported {len(rows)} rows from {csv_file} into {price_table(asset)}")
+
+def import_fx_csv(conn, fx_file=FX_FILE, currencies=CURRENCIES):
+    """Load FX CSV rows from each currency's newest stored date onwards"""
+    with open(fx_file, 'r', encoding='utf-8') as f:
+        table = list(csv.DictReader(f))
+    for currency in currencies:
+        asset = f"fx_{currency}"
+        rows = [(row['date'], float(row[currency])) for row in table if row.get(currency)]
+        rows = newer_rows(conn, rows, asset)
+        if rows:
+            upsert_prices(conn, rows, asset)
+            print(f"Imported {len(rows)} rows from {fx_file} into {price_table(asset)}")
+
+def upsert_prices(conn, rows, asset=DEFAULT_ASSET):
+    """Insert or update (date, price) rows and invalidate dependent indicators"""
+    if not rows:
+        return
+    ensure_asset(conn, asset)
+    with conn:
+        conn.executemany(f"""
+            INSERT INTO {price_table(asset)} (date, price) VALUES (?, ?)
+            ON CONFLICT(date) DO UPDATE SET price = excluded.price
+        """, rows)
+        # Only the next 199 rows depend on a changed price, but indicators are
+        # recomputed from MAX(date) onwards, so nothing after the gap may remain
+        earliest = min(date for date, _ in rows)
+        conn.execute("DELETE FROM indicators WHERE asset = ? AND date >= ?", (asset, earliest))
+
+def read_prices(conn, asset=DEFAULT_ASSET, start=None, end=None):
+    """Range query over the price table, ascending by date"""
+    ensure_asset(conn, asset)
+    query = f"SELECT date, price FROM {price_table(asset)} WHERE date >= ? AND date <= ? ORDER BY date"
+    return conn.execute(query, (start or '0000-00-00', end or '9999-99-99')).fetchall()
+
+def read_pending_prices(conn, asset=DEFAULT_ASSET):
+    """Prices still missing indicators, plus the 199 rows before them needed for the 200-day MA"""
+    table = price_table(asset)
+    row = conn.execute("SELECT MAX(date) FROM indicators WHERE asset = ?", (asset,)).fetchone()
+    last_done = row[0] or ''
+    history = conn.execute(
+        f"SELECT date, price FROM {table} WHERE date <= ? ORDER BY date DESC LIMIT 199",
+        (last_done,)
+    ).fetchall()
+    history.reverse()
+    pending = conn.execute(
+        f"SELECT date, price FROM {table} WHERE date > ? ORDER BY date", (last_done,)
+    ).fetchall()
+    return history, pending
+
+def upsert_indicators(conn, rows, asset=DEFAULT_ASSET):
+    """Insert or update (date, ma_200d, ma_200w_fit, ahr999) rows"""
+    with conn:
+        conn.executemany("""
+            INSERT INTO indicators (asset, date, ma_200d, ma_200w_fit, ahr999) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(asset, date) DO UPDATE SET
+                ma_200d = excluded.ma_200d,
+                ma_200w_fit = excluded.ma_200w_fit,
+                ahr999 = excluded.ahr999
+        """, [(asset,) + tuple(row) for row in rows])
+
+def read_with_indicators(conn, asset=DEFAULT_ASSET, start=None, end=None):
+    """Bulk read of prices joined with their materialized indicators"""
+    query = f"""
+        SELECT p.date, p.price, i.ma_200d, i.ma_200w_fit, i.ahr999
+        FROM {price_table(asset)} p
+        LEFT JOIN indicators i ON i.asset = ? AND i.date = p.date
+        WHERE p.date >= ? AND p.date <= ?
+        ORDER BY p.date
+    """
+    return conn.execute(query, (asset, start or '0000-00-00', end or '9999-99-99')).fetchall()
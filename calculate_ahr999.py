@@ -7,27 +7,94 @@ AHR999 = (BTC Price / 200-day MA) * (BTC Price / 200-week MA fit)
 import csv
 import json
 import math
+import os
 from datetime import datetime, timedelta
 from collections import defaultdict
 
+import btc_storage
+from btc_storage import CURRENCIES, FX_FILE
+
 # Bitcoin genesis date
 GENESIS_DATE = datetime(2009, 1, 3)
 START_DATE = datetime(2025, 10, 6)
 
 def read_btc_data():
-    """Read BTC price data from CSV"""
-    data = []
+    """Read BTC price data from CSV, or from SQLite when that backend is enabled"""
+    if btc_storage.use_sqlite():
+        return read_btc_data_sqlite()
+    
+    prices = {}
     with open('btc-price all.csv', 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
         for row in reader:
             if row['date'] and row['btc price']:
-                date = datetime.strptime(row['date'], '%Y-%m-%d')
-                price = float(row['btc price'])
-                data.append({'date': date, 'price': price})
+                # The last row for a date wins, as the SQLite backend appends
+                prices[row['date']] = float(row['btc price'])
+    data = [{'date': datetime.strptime(date, '%Y-%m-%d'), 'price': price}
+            for date, price in prices.items()]
     # Sort by date ascending
     data.sort(key=lambda x: x['date'])
     return data
 
+def read_btc_data_sqlite():
+    """Read BTC prices and materialized indicators from SQLite"""
+    conn = btc_storage.connect()
+    try:
+        refreshed = refresh_indicators(conn)
+        print(f"Recomputed indicators for {refreshed} new day(s)")
+        rows = btc_storage.read_with_indicators(conn)
+    finally:
+        conn.close()
+    return [{
+        'date': datetime.strptime(date, '%Y-%m-%d'),
+        'price': price,
+        'ma_200d': ma_200d,
+        'ma_200w_fit': ma_200w_fit,
+        'ahr999': ahr999
+    } for date, price, ma_200d, ma_200w_fit, ahr999 in rows]
+
+def read_fx_rates(currencies=CURRENCIES):
+    """Read FX rate series from CSV or SQLite, sorted by date ascending"""
+    series = {currency: [] for currency in currencies}
+    if btc_storage.use_sqlite():
+        conn = btc_storage.connect()
+        try:
+            for currency in currencies:
+                rows = btc_storage.read_prices(conn, f"fx_{currency}")
+                series[currency] = [(datetime.strptime(d, '%Y-%m-%d'), rate) for d, rate in rows]
+        finally:
+            conn.close()
+        return series
+    
+    if not os.path.exists(FX_FILE):
+        return series
+    with open(FX_FILE, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            date = datetime.strptime(row['date'], '%Y-%m-%d')
+            for currency in currencies:
+                if row.get(currency):
+                    series[currency].append((date, float(row[currency])))
+    for rows in series.values():
+        rows.sort(key=lambda x: x[0])
+    return series
+
+def asof_join(dates, fx_series):
+    """Align FX series to sorted dates in one merge pass, forward-filling gaps"""
+    names = list(fx_series)
+    positions = [0] * len(names)
+    latest = [None] * len(names)
+    aligned = {name: [] for name in names}
+    for date in dates:
+        for k, name in enumerate(names):
+            rows = fx_series[name]
+            j = positions[k]
+            while j < len(rows) and rows[j][0] <= date:
+                latest[k] = rows[j][1]
+                j += 1
+            positions[k] = j
+            aligned[name].append(latest[k])
+    return aligned
+
 def calculate_200d_ma(data, index):
     """Calculate 200-day moving average"""
     if index < 199:
@@ -49,6 +116,19 @@ def calculate_ahr999(price, ma_200d, ma_200w_fit):
         return None
     return (price / ma_200d) * (price / ma_200w_fit)
 
+def refresh_indicators(conn, asset=btc_storage.DEFAULT_ASSET):
+    """Compute and store indicators for dates after the last materialized row"""
+    history, pending = btc_storage.read_pending_prices(conn, asset)
+    data = [{'date': date, 'price': price} for date, price in history + pending]
+    rows = []
+    for i in range(len(history), len(data)):
+        ma_200d = calculate_200d_ma(data, i)
+        ma_200w_fit = calculate_200w_ma_fit(datetime.strptime(data[i]['date'], '%Y-%m-%d'))
+        ahr999 = calculate_ahr999(data[i]['price'], ma_200d, ma_200w_fit)
+        rows.append((data[i]['date'], ma_200d, ma_200w_fit, ahr999))
+    btc_storage.upsert_indicators(conn, rows, asset)
+    return len(rows)
+
 def generate_investment_data(data):
     """Generate investment tracking data for different AHR999 thresholds"""
     thresholds = [1.0, 0.9, 0.8, 0.7, 0.6, 0.5, 0.4]
@@ -59,6 +139,7 @@ def generate_investment_data(data):
     for threshold in thresholds:
         investments[threshold] = {
             'purchases': [],
+            'purchase_indices': [],  # Positions in data, for aligned FX rates
             'total_invested': 0,
             'total_btc': 0
         }
@@ -69,10 +150,14 @@ def generate_investment_data(data):
         date = item['date']
         price = item['price']
         
-        # Only calculate if we have enough data
-        ma_200d = calculate_200d_ma(data, i)
-        ma_200w_fit = calculate_200w_ma_fit(date)
-        ahr999 = calculate_ahr999(price, ma_200d, ma_200w_fit)
+        if 'ahr999' in item:
+            # Already materialized by the SQLite backend
+            ma_200d, ma_200w_fit, ahr999 = item['ma_200d'], item['ma_200w_fit'], item['ahr999']
+        else:
+            # Only calculate if we have enough data
+            ma_200d = calculate_200d_ma(data, i)
+            ma_200w_fit = calculate_200w_ma_fit(date)
+            ahr999 = calculate_ahr999(price, ma_200d, ma_200w_fit)
         
         # Track investments from START_DATE onwards
         if date >= START_DATE and ahr999 is not None:
@@ -86,6 +171,7 @@ def generate_investment_data(data):
                         'usd_invested': investment_amount,
                         'ahr999': ahr999
                     })
+                    investments[threshold]['purchase_indices'].append(i)
                     investments[threshold]['total_invested'] += investment_amount
                     investments[threshold]['total_btc'] += btc_bought
         
@@ -123,6 +209,65 @@ def calculate_current_value(investments, current_price):
     
     return summary
 
+def generate_currency_data(data, rates, investments, history_days=365):
+    """Express prices, indicators and investment results in another currency"""
+    converted = [item['price'] * rate if rate is not None else None for item, rate in zip(data, rates)]
+    history = []
+    window_sum = None
+    for i in range(max(0, len(data) - history_days), len(data)):
+        price = converted[i]
+        if price is None:
+            continue
+        # Forward-filled rates are never None after the first one, so once the
+        # window start is converted the sum can slide from row to row
+        ma_200d = None
+        if i >= 199 and converted[i - 199] is not None:
+            if window_sum is None:
+                window_sum = sum(converted[i - 199:i + 1])
+            else:
+                window_sum += price - converted[i - 200]
+            ma_200d = window_sum / 200
+        rate = rates[i]
+        ma_200w_fit = calculate_200w_ma_fit(data[i]['date'])
+        if ma_200w_fit is not None:
+            ma_200w_fit *= rate
+        ahr999 = calculate_ahr999(price, ma_200d, ma_200w_fit)
+        if ahr999 is not None:
+            history.append({
+                'date': data[i]['date'].strftime('%Y-%m-%d'),
+                'price': price,
+                'ma_200d': ma_200d,
+                'ma_200w_fit': ma_200w_fit,
+                'ahr999': ahr999
+            })
+    
+    current_rate = rates[-1] if rates else None
+    current_price = data[-1]['price'] * current_rate if current_rate is not None else None
+    
+    summary = {}
+    for threshold, inv in investments.items():
+        # Purchases happen on BTC dates, so their rates are already aligned
+        purchase_rates = [rates[i] for i in inv['purchase_indices']]
+        if current_price is None or None in purchase_rates:
+            continue
+        total_invested = sum(p['usd_invested'] * r for p, r in zip(inv['purchases'], purchase_rates))
+        current_value = inv['total_btc'] * current_price
+        profit = current_value - total_invested
+        summary[threshold] = {
+            'total_invested': total_invested,
+            'current_value': current_value,
+            'profit': profit,
+            'roi': (profit / total_invested * 100) if total_invested > 0 else 0
+        }
+    
+    return {
+        'fx_rate': current_rate,
+        'current_price': current_price,
+        'current_ahr999': history[-1]['ahr999'] if history else None,
+        'summary': summary,
+        'ahr999_history': history
+    }
+
 def main():
     print("Reading Bitcoin price data...")
     data = read_btc_data()
@@ -150,6 +295,16 @@ def main():
     # Calculate summary
     summary = calculate_current_value(investments, current_price)
     
+    # Convert to other currencies
+    fx_series = read_fx_rates()
+    rates = asof_join([item['date'] for item in data], fx_series)
+    currencies = {}
+    for currency, fx_rows in fx_series.items():
+        if not fx_rows:
+            print(f"No FX rates for {currency.upper()}, skipping")
+            continue
+        currencies[currency] = generate_currency_data(data, rates[currency], investments)
+    
     # Save results
     output = {
         'last_updated': current_date.strftime('%Y-%m-%d %H:%M:%S'),
@@ -157,7 +312,8 @@ def main():
         'current_ahr999': current_ahr999,
         'investment_start_date': START_DATE.strftime('%Y-%m-%d'),
         'summary': summary,
-        'ahr999_history': results[-365:] if len(results) > 365 else results  # Last year of data
+        'ahr999_history': results[-365:] if len(results) > 365 else results,  # Last year of data
+        'currencies': currencies
     }
     
     with open('ahr999_data.json', 'w', encoding='utf-8') as f:
@@ -3,9 +3,23 @@
 Generate HTML dashboard for AHR999 Bitcoin investment tracking
 """
 
+import gzip
+import hashlib
 import json
+import os
 from datetime import datetime
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Output directory for the GitHub Pages artifact
+DIST_DIR = 'dist'
+
+# Display symbols for converted currencies
+CURRENCY_SYMBOLS = {'cny': '¥', 'eur': '€'}
+
 def format_number(num):
     """Format number with commas"""
     return f"{num:,.2f}"
@@ -55,6 +69,14 @@ def generate_html(data):
     ahr999_color = get_ahr999_color(current_ahr999)
     ahr999_signal = get_ahr999_signal(current_ahr999)
     
+    # Current price in other configured currencies
+    converted_prices = []
+    for currency, c in data.get('currencies', {}).items():
+        if c.get('current_price') is not None:
+            symbol = CURRENCY_SYMBOLS.get(currency, currency.upper() + ' ')
+            converted_prices.append(f"≈ {symbol}{format_number(c['current_price'])}")
+    converted_html = f'<div class="signal">{" / ".join(converted_prices)}</div>' if converted_prices else ''
+    
     # Generate investment cards
     investment_cards = []
     for threshold in sorted([float(k) for k in summary.keys()], reverse=True):
@@ -402,6 +424,7 @@ def generate_html(data):
             <div class="stat-card">
                 <h2>当前比特币价格</h2>
                 <div class="value">${format_number(current_price)}</div>
+                {converted_html}
             </div>
             
             <div class="stat-card">
@@ -443,6 +466,77 @@ def generate_html(data):
     
     return html
 
+def minify_html(html):
+    """Strip indentation and blank lines from generated HTML"""
+    lines = (line.strip() for line in html.splitlines())
+    return '\n'.join(line for line in lines if line)
+
+def minify_json(data):
+    """Serialize JSON without whitespace"""
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+
+def write_asset(name, content):
+    """Write an asset plus precompressed .gz and .br siblings"""
+    path = os.path.join(DIST_DIR, name)
+    with open(path, 'wb') as f:
+        f.write(content)
+    # mtime=0 keeps the gzip output byte-identical for identical input
+    with open(path + '.gz', 'wb') as f:
+        f.write(gzip.compress(content, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(path + '.br', 'wb') as f:
+            f.write(brotli.compress(content, quality=11))
+    elif os.path.exists(path + '.br'):
+        # A .br from an earlier build would no longer match the new content
+        os.remove(path + '.br')
+    return {
+        'sha256': hashlib.sha256(content).hexdigest(),
+        'size': len(content)
+    }
+
+def load_manifest():
+    """Load the manifest from a previous build (restored from the CI cache), if any"""
+    try:
+        with open(os.path.join(DIST_DIR, 'manifest.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def build_static_site(data, html):
+    """Write minified, precompressed assets and a manifest of their hashes"""
+    os.makedirs(DIST_DIR, exist_ok=True)
+    previous = load_manifest().get('files', {})
+
+    files = {
+        'ahr999_data.json': write_asset('ahr999_data.json', minify_json(data).encode('utf-8')),
+        'index.html': write_asset('index.html', minify_html(html).encode('utf-8'))
+    }
+
+    # Drop files an earlier build wrote that this one no longer produces
+    for stale in set(previous) - set(files):
+        for suffix in ('', '.gz', '.br'):
+            try:
+                os.remove(os.path.join(DIST_DIR, stale + suffix))
+            except OSError:
+                pass
+
+    changed = sorted(
+        name for name, entry in files.items()
+        if previous.get(name, {}).get('sha256') != entry['sha256']
+    )
+    manifest = {
+        'generated': data['last_updated'],
+        'files': files,
+        'changed': changed
+    }
+    with open(os.path.join(DIST_DIR, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    if brotli is None:
+        print("brotli not installed, skipping .br files")
+    print(f"Static site written to {DIST_DIR}/ ({len(changed)} changed file(s))")
+    return manifest
+
 def main():
     print("Loading AHR999 data...")
     with open('ahr999_data.json', 'r', encoding='utf-8') as f:
@@ -455,6 +549,9 @@ def main():
         f.write(html)
     
     print("Dashboard generated: index.html")
+    
+    print("Building static site...")
+    build_static_site(data, html)
 
 if __name__ == '__main__':
     main()
@@ -1,14 +1,21 @@
 #!/usr/bin/env python3
 """
 Update Bitcoin price in btc-price all.csv
-Fetches current BTC price and adds it to the CSV file
+Fetches current BTC price and adds it to the CSV file, along with USD FX rates
 """
 
 import csv
+import os
 import requests
 from datetime import datetime
 import sys
 
+import btc_storage
+from btc_storage import CURRENCIES, FX_FILE
+
+# Earliest date requested when backfilling FX history
+FX_HISTORY_START = '2013-01-01'
+
 def get_btc_price():
     """Fetch current Bitcoin price from CoinGecko API"""
     try:
@@ -36,8 +43,71 @@ def get_btc_price():
             print(f"CoinCap also failed: {e2}")
             sys.exit(1)
 
+def get_fx_rates(start):
+    """Fetch USD FX rates from start onwards from the Frankfurter (ECB) API, as {date: {currency: rate}}"""
+    try:
+        response = requests.get(
+            f'https://api.frankfurter.app/{start}..',
+            params={'from': 'USD', 'to': ','.join(c.upper() for c in CURRENCIES)},
+            timeout=30
+        )
+        response.raise_for_status()
+        series = response.json()['rates']
+    except Exception as e:
+        # FX rates are optional; missed days are fetched again on the next run
+        print(f"FX rate fetch failed: {e}")
+        return {}
+    return {
+        date: {currency.lower(): rate for currency, rate in rates.items()}
+        for date, rates in series.items()
+    }
+
+def update_fx_rates():
+    """Store FX rates since the last stored date, backfilling the full history for new currencies"""
+    if btc_storage.use_sqlite():
+        conn = btc_storage.connect()
+        try:
+            latest = [btc_storage.latest_date(conn, f"fx_{c}") for c in CURRENCIES]
+            fx = get_fx_rates(FX_HISTORY_START if None in latest else min(latest))
+            if not fx:
+                return
+            for currency in CURRENCIES:
+                rows = [(date, rates[currency]) for date, rates in fx.items() if currency in rates]
+                btc_storage.upsert_prices(conn, rows, f"fx_{currency}")
+        finally:
+            conn.close()
+        print(f"Stored FX rates for {len(fx)} day(s) in {btc_storage.DB_FILE}")
+        return
+    
+    existing = {}
+    if os.path.exists(FX_FILE):
+        with open(FX_FILE, 'r', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                existing[row['date']] = {k: v for k, v in row.items() if k != 'date' and v}
+    
+    backfill = not existing or any(c not in existing[max(existing)] for c in CURRENCIES)
+    fx = get_fx_rates(FX_HISTORY_START if backfill else max(existing))
+    if not fx:
+        return
+    for date, rates in fx.items():
+        existing.setdefault(date, {}).update(rates)
+    
+    columns = sorted({c for rates in existing.values() for c in rates})
+    with open(FX_FILE, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['date'] + columns)
+        # Newest first, matching the BTC price CSV
+        for date in sorted(existing, reverse=True):
+            writer.writerow([date] + [existing[date].get(c, '') for c in columns])
+    
+    print(f"Successfully updated {FX_FILE} with FX rates for {len(fx)} day(s)")
+
 def update_csv(price):
     """Update the CSV file with new price data"""
+    if btc_storage.use_sqlite():
+        update_db(price)
+        return
+    
     csv_file = 'btc-price all.csv'
     today = datetime.now().strftime('%Y-%m-%d')
     
@@ -47,13 +117,15 @@ def update_csv(price):
         header = next(reader)
         rows = list(reader)
     
-    # Check if today's data already exists
-    if rows and rows[0][0] == today:
+    # Check if today's data already exists (rows appended by the SQLite
+    # backend may sit at the end of the file)
+    if any(row and row[0] == today for row in rows):
         print(f"Updating existing entry for {today}")
-        rows[0][1] = str(price)
+        rows = [row for row in rows if not row or row[0] != today]
     else:
         print(f"Adding new entry for {today}")
-        rows.insert(0, [today, str(price)])
+    rows.insert(0, [today, str(price)])
+    rows.sort(key=lambda row: row[0] if row else '', reverse=True)
     
     # Write back to file
     with open(csv_file, 'w', encoding='utf-8', newline='') as f:
@@ -63,12 +135,31 @@ def update_csv(price):
     
     print(f"Successfully updated {csv_file} with price ${price:,} for {today}")
 
+def update_db(price):
+    """Upsert today's price into the SQLite backend and append it to the CSV"""
+    today = datetime.now().strftime('%Y-%m-%d')
+    conn = btc_storage.connect()
+    try:
+        btc_storage.upsert_prices(conn, [(today, float(price))])
+    finally:
+        conn.close()
+    
+    # Append rather than rewrite; readers keep the last row for a date, so
+    # the CSV stays the full committed history
+    with open(btc_storage.CSV_FILE, 'a', encoding='utf-8', newline='') as f:
+        csv.writer(f).writerow([today, str(price)])
+    
+    print(f"Successfully upserted price ${price:,} for {today} into {btc_storage.DB_FILE} and {btc_storage.CSV_FILE}")
+
 def main():
     print("Fetching Bitcoin price...")
     price = get_btc_price()
     print(f"Current BTC price: ${price:,}")
     
     update_csv(price)
+    
+    print("Fetching FX rates...")
+    update_fx_rates()
 
 if __name__ == '__main__':
     main()